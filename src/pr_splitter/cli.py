@@ -1,13 +1,25 @@
+import io
 from collections import defaultdict
 from pathlib import Path
+from typing import Final
 
 import click
 
 from pr_splitter.errors import PrSplitterError
+from pr_splitter.git_ops import open_repo
 from pr_splitter.github import create_all_prs
 from pr_splitter.models import SplitConfig
 from pr_splitter.splitter import execute_split, split
 
+_STATUS_ICONS: Final[dict[str, str]] = {
+    "A": "+",
+    "M": "~",
+    "D": "-",
+    "R": "→",
+    "C": "©",
+    "T": "T",
+}
+
 
 def parse_group_option(values: tuple[str, ...]) -> dict[int, list[str]]:
     result: dict[int, list[str]] = defaultdict(list)
@@ -167,36 +179,35 @@ def split_cmd(
             titles=titles,
         )
 
-        result = split(config)
+        repo = open_repo(str(config.repo_path))
+        result = split(config, repo)
 
         # Display warnings
         for warning in result.warnings:
             click.secho(f"Warning: {warning}", fg="yellow")
 
-        # Display plan
-        click.echo()
-        click.secho(
-            f"Split plan: {len(result.groups)} PR(s) from '{result.source_branch}'",
-            fg="blue",
-            bold=True,
+        # Display plan, buffered so large splits are written in one go
+        plan = io.StringIO()
+        plan.write("\n")
+        plan.write(
+            click.style(
+                f"Split plan: {len(result.groups)} PR(s) from '{result.source_branch}'",
+                fg="blue",
+                bold=True,
+            )
         )
-        click.echo()
+        plan.write("\n\n")
 
         for group in result.groups:
-            click.secho(f"  {group.title}", fg="green", bold=True)
-            click.echo(f"    Branch: {group.branch_name}")
-            click.echo(f"    Files ({len(group.files)}):")
+            plan.write(click.style(f"  {group.title}", fg="green", bold=True))
+            plan.write(f"\n    Branch: {group.branch_name}\n")
+            plan.write(f"    Files ({len(group.files)}):\n")
             for f in group.files:
-                status_icon = {
-                    "A": "+",
-                    "M": "~",
-                    "D": "-",
-                    "R": "→",
-                    "C": "©",
-                    "T": "T",
-                }.get(f.status, "?")
-                click.echo(f"      {status_icon} {f.path}")
-            click.echo()
+                status_icon = _STATUS_ICONS.get(f.status, "?")
+                plan.write(f"      {status_icon} {f.path}\n")
+            plan.write("\n")
+
+        click.echo(plan.getvalue(), nl=False)
 
         if dry_run:
             click.secho("Dry run — no branches created.", fg="yellow")
@@ -209,7 +220,7 @@ def split_cmd(
 
         # Execute
         click.echo("Creating branches...")
-        execute_split(config, result)
+        execute_split(config, result, repo)
         click.secho("Branches created successfully.", fg="green")
 
         if push:
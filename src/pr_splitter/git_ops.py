@@ -1,4 +1,10 @@
+import os
 import subprocess
+import tempfile
+import weakref
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO
 
 from git import Repo
 from git.exc import GitCommandError, InvalidGitRepositoryError
@@ -7,29 +13,57 @@ from pr_splitter.errors import GitError
 from pr_splitter.models import FileDiff
 
 
+# Repos by resolved path, shared for as long as any caller holds one, so a
+# split and its execution reuse one Repo and its persistent git processes.
+_REPO_CACHE: weakref.WeakValueDictionary[str, Repo] = weakref.WeakValueDictionary()
+
+
 def open_repo(path: str) -> Repo:
+    key = os.path.realpath(path)
+    repo = _REPO_CACHE.get(key)
+    if repo is not None:
+        return repo
     try:
         repo = Repo(path, search_parent_directories=True)
     except InvalidGitRepositoryError:
         raise GitError(f"Not a git repository: {path}")
+    # Read-only commands like `git status` should not take index.lock to
+    # refresh the index.
+    repo.git.update_environment(GIT_OPTIONAL_LOCKS="0")
+    _REPO_CACHE[key] = repo
     return repo
 
 
-def validate_repo_state(repo: Repo, base_branch: str) -> None:
-    if repo.is_dirty(untracked_files=True):
+def validate_repo_state(repo: Repo, base_branch: str) -> str:
+    # One `git status` yields both dirtiness and the current branch; returns
+    # the current branch name so callers don't have to look it up again.
+    status = repo.git.status(
+        "--porcelain=v2", "--branch", "-z", "--untracked-files=normal"
+    )
+    current: str | None = None
+    dirty = False
+    for record in status.split("\0"):
+        if record.startswith("# branch.head "):
+            current = record[len("# branch.head ") :]
+        elif record and not record.startswith("#"):
+            dirty = True
+
+    if dirty:
         raise GitError("Working tree is not clean. Commit or stash your changes first.")
 
     try:
-        repo.commit(base_branch)
-    except Exception:
+        repo.git.rev_parse("--verify", "--quiet", f"{base_branch}^{{commit}}")
+    except GitCommandError:
         raise GitError(f"Base branch '{base_branch}' does not exist.")
 
-    current = get_current_branch(repo)
+    if current is None or current == "(detached)":
+        raise GitError("HEAD is detached. Switch to a branch first.")
     if current == base_branch:
         raise GitError(
             f"Currently on base branch '{base_branch}'. "
             "Switch to a feature branch first."
         )
+    return current
 
 
 def get_current_branch(repo: Repo) -> str:
@@ -38,24 +72,123 @@ def get_current_branch(repo: Repo) -> str:
     return repo.active_branch.name
 
 
-def get_changed_files(repo: Repo, base_branch: str) -> list[FileDiff]:
+def get_changed_files(
+    repo: Repo, base_branch: str, paths: Sequence[str] = ()
+) -> list[FileDiff]:
     merge_base = repo.merge_base(base_branch, "HEAD")
     if not merge_base:
         raise GitError(f"No common ancestor between '{base_branch}' and HEAD.")
 
-    result = repo.git.diff("--name-status", "--no-renames", merge_base[0].hexsha, "HEAD")
-    if not result:
-        return []
+    # One diff yields both the status and the size of every file. With -z,
+    # "--raw" emits ":<modes> <shas> <status>\0path\0" per file, followed by
+    # "--numstat" "added\tdeleted\tpath\0" records in the same order ("-"
+    # counts for binary files, sized 0). Paths are unquoted, so names with
+    # tabs, newlines or non-ASCII survive intact, and the output is parsed as
+    # it streams in. Entries come in path order unless the user's
+    # diff.orderFile says otherwise, so callers must not assume sorting.
+    proc = repo.git.diff(
+        "--raw",
+        "--numstat",
+        "-z",
+        "--no-renames",
+        merge_base[0].hexsha,
+        "HEAD",
+        "--",
+        # Limit the diff to these path prefixes, taken verbatim from the root.
+        *(f":(top,literal){path}" for path in paths),
+        as_process=True,
+    )
+    records = _iter_nul_records(proc.stdout)
+
+    entries: list[tuple[str, str]] = []
+    sizes: list[int] = []
+    for record in records:
+        if record.startswith(b":"):
+            path = next(records).decode("utf-8", "surrogateescape")
+            entries.append((chr(record[-1]), path))
+        else:
+            added, deleted, _ = record.split(b"\t", 2)
+            sizes.append(0 if added == b"-" else int(added) + int(deleted))
+
+    try:
+        proc.wait()
+    except GitCommandError as e:
+        raise GitError(f"Failed to list changed files: {e}")
+
+    # Git's own output, so skip pydantic validation (A/M/D/T only, since
+    # renames and copies are disabled).
+    try:
+        return [
+            FileDiff.model_construct(status=status, path=path, size=size)
+            for (status, path), size in zip(entries, sizes, strict=True)
+        ]
+    except ValueError:
+        raise GitError(
+            f"Failed to list changed files: git reported {len(entries)} "
+            f"changed paths but {len(sizes)} line counts."
+        )
+
+
+def _iter_nul_records(stream: IO[bytes], chunk_size: int = 65536) -> Iterator[bytes]:
+    pending = b""
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        *records, pending = (pending + chunk).split(b"\0")
+        yield from records
+    if pending:
+        yield pending
+
+
+def _git_with_input(
+    repo: Repo,
+    args: list[str],
+    input: str,
+    env: dict[str, str] | None = None,
+) -> str:
+    # GitPython's istream needs a real file handle, so feed stdin directly.
+    # Paths from get_changed_files may carry surrogate escapes for non-UTF-8
+    # names; encode them back to the original bytes rather than failing.
+    cmd = ["git", *args]
+    try:
+        result = subprocess.run(
+            cmd,
+            cwd=repo.working_dir,
+            input=input.encode("utf-8", "surrogateescape"),
+            env={**os.environ, **env} if env else None,
+            check=True,
+            capture_output=True,
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode("utf-8", "replace")
+        raise GitCommandError(cmd, e.returncode, stderr)
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+
+def get_merge_base(repo: Repo, base_branch: str, source_branch: str) -> str:
+    # Plain git call rather than Repo.merge_base: GitPython object lookups
+    # share one persistent cat-file process, which is not thread-safe.
+    try:
+        return str(repo.git.merge_base(base_branch, source_branch))
+    except GitCommandError:
+        raise GitError(
+            f"No common ancestor between '{base_branch}' and '{source_branch}'."
+        )
+
 
-    files: list[FileDiff] = []
-    for line in result.strip().split("\n"):
-        parts = line.split("\t")
-        status = parts[0][0]  # Take first char (e.g., R100 -> R)
-        path = parts[-1]
-        old_path = parts[1] if len(parts) == 3 else None
-        files.append(FileDiff(status=status, path=path, old_path=old_path))
+def get_tree_entries(repo: Repo, treeish: str) -> dict[str, tuple[str, str]]:
+    # path -> (mode, object sha) for every entry in the tree, recursively.
+    try:
+        output = repo.git.ls_tree("-r", "-z", treeish)
+    except GitCommandError as e:
+        raise GitError(f"Failed to read tree of '{treeish}': {e}")
 
-    return files
+    entries: dict[str, tuple[str, str]] = {}
+    for record in output.split("\0"):
+        if not record:
+            continue
+        info, path = record.split("\t", 1)
+        mode, _type, sha = info.split(" ")
+        entries[path] = (mode, sha)
+    return entries
 
 
 def create_branch_with_files(
@@ -64,63 +197,139 @@ def create_branch_with_files(
     base_branch: str,
     source_branch: str,
     files: list[FileDiff],
+    merge_base_sha: str | None = None,
+    source_tree_entries: dict[str, tuple[str, str]] | None = None,
 ) -> None:
-    original_branch = get_current_branch(repo)
+    commit = _build_split_commit(
+        repo,
+        branch_name,
+        base_branch,
+        source_branch,
+        files,
+        merge_base_sha,
+        source_tree_entries,
+    )
     try:
-        # Create new branch from base
-        merge_base = repo.merge_base(base_branch, source_branch)
-        if not merge_base:
-            raise GitError(
-                f"No common ancestor between '{base_branch}' and '{source_branch}'."
-            )
-
-        repo.git.checkout(base_branch)
-        repo.git.checkout("-b", branch_name)
+        # An empty old value makes update-ref fail if the branch already exists.
+        repo.git.update_ref(f"refs/heads/{branch_name}", commit, "")
+    except GitCommandError as e:
+        raise GitError(f"Failed to create branch '{branch_name}': {e}")
 
-        # Checkout each file from source branch
-        deleted_files: list[str] = []
-        checkout_files: list[str] = []
-        for f in files:
-            if f.status == "D":
-                deleted_files.append(f.path)
-            else:
-                checkout_files.append(f.path)
 
-        if checkout_files:
-            repo.git.checkout(source_branch, "--", *checkout_files)
+def _build_split_commit(
+    repo: Repo,
+    branch_name: str,
+    base_branch: str,
+    source_branch: str,
+    files: list[FileDiff],
+    merge_base_sha: str | None = None,
+    source_tree_entries: dict[str, tuple[str, str]] | None = None,
+) -> str:
+    # Callers building several branches pass the merge base and source tree
+    # in, so they are looked up once rather than per branch.
+    if merge_base_sha is None:
+        merge_base_sha = get_merge_base(repo, base_branch, source_branch)
+    if source_tree_entries is None:
+        source_tree_entries = get_tree_entries(repo, source_branch)
 
-        if deleted_files:
-            repo.git.rm(*deleted_files)
+    try:
+        null_sha = "0" * len(merge_base_sha)
 
-        # Commit
-        repo.git.add("-A")
+        # Stage the split as index entries: source blobs for changed files,
+        # removals (mode 0) for deleted ones.
+        index_info: list[str] = []
+        for f in files:
+            if f.status == "D":
+                index_info.append(f"0 {null_sha}\t{f.path}")
+                continue
+            if f.path not in source_tree_entries:
+                raise GitError(f"File '{f.path}' not found on '{source_branch}'.")
+            mode, sha = source_tree_entries[f.path]
+            index_info.append(f"{mode} {sha}\t{f.path}")
 
         file_count = len(files)
-        repo.git.commit(
-            "-m",
-            f"Part of split from {source_branch} ({file_count} file{'s' if file_count != 1 else ''})",
+        message = (
+            f"Part of split from {source_branch} "
+            f"({file_count} file{'s' if file_count != 1 else ''})"
         )
 
+        # Build the commit in a private index with plumbing commands, so the
+        # working tree and the checked-out branch are never touched.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+            repo.git.read_tree(base_branch, env=env)
+            _git_with_input(
+                repo,
+                ["update-index", "-z", "--index-info"],
+                "".join(f"{line}\0" for line in index_info),
+                env=env,
+            )
+            tree = repo.git.write_tree(env=env)
+
+        commit: str = repo.git.commit_tree(tree, "-p", base_branch, "-m", message)
+        return commit
+
     except GitCommandError as e:
         raise GitError(f"Failed to create branch '{branch_name}': {e}")
-    finally:
-        # Always return to original branch
-        try:
-            repo.git.checkout(original_branch)
-        except GitCommandError:
-            pass
+
+
+def create_all_branches(
+    repo: Repo,
+    base_branch: str,
+    source_branch: str,
+    branches: list[tuple[str, list[FileDiff]]],
+) -> None:
+    if not branches:
+        return
+
+    # Shared by every branch: resolve them once for the whole batch.
+    merge_base_sha = get_merge_base(repo, base_branch, source_branch)
+    source_tree_entries = get_tree_entries(repo, source_branch)
+
+    # Commits are built in private index files without touching the working
+    # tree, so they can be materialized concurrently.
+    max_workers = min(os.cpu_count() or 4, len(branches))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _build_split_commit,
+                repo=repo,
+                branch_name=branch_name,
+                base_branch=base_branch,
+                source_branch=source_branch,
+                files=files,
+                merge_base_sha=merge_base_sha,
+                source_tree_entries=source_tree_entries,
+            )
+            for branch_name, files in branches
+        ]
+        commits = [future.result() for future in futures]
+
+    # All refs are written in one update-ref transaction: either every
+    # branch is created or, if any already exists, none is.
+    updates = "".join(
+        f"create refs/heads/{branch_name} {commit}\n"
+        for (branch_name, _), commit in zip(branches, commits)
+    )
+    try:
+        _git_with_input(repo, ["update-ref", "--stdin"], updates)
+    except GitCommandError as e:
+        raise GitError(f"Failed to create branches: {e}")
 
 
 def branch_exists(repo: Repo, name: str) -> bool:
-    # Check local branches
-    for ref in repo.branches:
-        if ref.name == name:
+    # One for-each-ref call instead of walking every local and remote ref.
+    # Ref patterns also match by prefix up to a slash ("feature" would match
+    # "feature/x"), so compare the returned names exactly.
+    local_ref = f"refs/heads/{name}"
+    output = repo.git.for_each_ref(
+        local_ref, f"refs/remotes/*/{name}", format="%(refname)"
+    )
+    for ref in output.splitlines():
+        if ref == local_ref:
+            return True
+        if ref.startswith("refs/remotes/") and ref.split("/", 3)[3] == name:
             return True
-    # Check remote branches
-    for remote in repo.remotes:
-        for ref in remote.refs:
-            if ref.remote_head == name:
-                return True
     return False
 
 
@@ -142,3 +351,20 @@ def push_branch(branch_name: str, repo_path: str) -> None:
         )
     except subprocess.CalledProcessError as e:
         raise GitError(f"Failed to push branch '{branch_name}': {e.stderr}")
+
+
+def push_branches(branch_names: list[str], repo_path: str) -> None:
+    # One push for all branches: a single connection, and a single process
+    # writing the branch.<name>.* upstream entries into .git/config (parallel
+    # `push -u` calls race on that file and can lose upstreams).
+    try:
+        subprocess.run(
+            ["git", "push", "-u", "origin", *branch_names],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        names = ", ".join(f"'{name}'" for name in branch_names)
+        raise GitError(f"Failed to push branches {names}: {e.stderr}")
@@ -1,8 +1,9 @@
 import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from pr_splitter.errors import GitHubError
-from pr_splitter.git_ops import push_branch
+from pr_splitter.git_ops import push_branches
 from pr_splitter.models import CreatedPr, PrGroup
 
 
@@ -96,11 +97,30 @@ def create_all_prs(
     repo_path: str,
 ) -> list[CreatedPr]:
     check_gh_available()
+    if not groups:
+        return []
+
+    push_branches([group.branch_name for group in groups], repo_path)
+
+    # PR creation is a network-bound subprocess call per group, so run them
+    # concurrently; results keep the order of ``groups``.
+    with ThreadPoolExecutor(max_workers=min(8, len(groups))) as executor:
+        futures = [
+            executor.submit(create_pr, group, base_branch, draft, repo_path)
+            for group in groups
+        ]
 
     created: list[CreatedPr] = []
-    for group in groups:
-        push_branch(group.branch_name, repo_path)
-        pr = create_pr(group, base_branch, draft, repo_path)
-        created.append(pr)
+    errors: list[str] = []
+    for future in futures:
+        try:
+            created.append(future.result())
+        except GitHubError as e:
+            errors.append(str(e))
 
+    if errors:
+        # The other groups' PRs exist by now; say which, so they aren't
+        # created twice on a retry.
+        done = "\n".join(f"  {pr.title}: {pr.url}" for pr in created) or "  (none)"
+        raise GitHubError("\n".join(errors) + f"\nPRs created:\n{done}")
     return created
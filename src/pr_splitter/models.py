@@ -1,7 +1,7 @@
 from pathlib import Path
 from typing import Literal
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class SplitConfig(BaseModel):
@@ -37,10 +37,17 @@ class SplitConfig(BaseModel):
         return self
 
 
+FileStatus = Literal["A", "M", "D", "R", "C", "T"]
+
+
 class FileDiff(BaseModel):
+    # Immutable and hashable so diffs can be shared between groups and sets.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     path: str
-    status: Literal["A", "M", "D", "R", "C", "T"]
+    status: FileStatus
     old_path: str | None = None
+    size: int = 0  # lines added + deleted; 0 when unknown or binary
 
 
 class PrGroup(BaseModel):
@@ -51,6 +58,10 @@ class PrGroup(BaseModel):
     body: str
     depends_on: str | None = None
 
+    @property
+    def paths(self) -> tuple[str, ...]:
+        return tuple(f.path for f in self.files)
+
 
 class SplitResult(BaseModel):
     groups: list[PrGroup]
@@ -58,6 +69,10 @@ class SplitResult(BaseModel):
     source_branch: str = ""
     base_branch: str = ""
 
+    @property
+    def total_files(self) -> int:
+        return sum(len(g.files) for g in self.groups)
+
 
 class CreatedPr(BaseModel):
     number: int
@@ -1,54 +1,232 @@
+import functools
+import heapq
+import re
+from collections.abc import Callable
+from itertools import compress, islice
+from operator import attrgetter, le
+from typing import Final
+
 import pathspec
+from git import Repo
 
 from pr_splitter.errors import ValidationError
 from pr_splitter.git_ops import (
-    create_branch_with_files,
+    create_all_branches,
     get_changed_files,
-    get_current_branch,
     open_repo,
     validate_repo_state,
 )
 from pr_splitter.github import get_current_pr_info
 from pr_splitter.models import FileDiff, PrGroup, SplitConfig, SplitResult
 
+# Include pattern sets that match every path (``**/*`` is the --files default).
+_MATCH_ALL_PATTERNS = {(), ("**/*",), ("**",)}
+
+# "dir/**" (optionally rooted with "/") without glob characters, escapes or
+# "."/".." segments matches exactly the paths under dir/, so a startswith()
+# check is enough.
+_LITERAL_DIR_PATTERN = re.compile(r"(?![!#])/?((?:(?!\.\.?/)[^*?\[\\/]+/)+)\*\*")
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+_BRANCH_NAME_TEMPLATE: Final = "{base}-part-{part}-of-{total}"
+
+_PR_BODY_TEMPLATE: Final = (
+    "{prefix}Part {part} of {total} from `{source_branch}`.\n\n"
+    "## Files\n\n{file_lines}\n{footer}"
+)
+
+_STATUS_LABELS: Final[dict[str, str]] = {
+    "A": "added",
+    "M": "modified",
+    "D": "deleted",
+    "R": "renamed",
+    "C": "copied",
+    "T": "type changed",
+}
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_pattern(pattern: str) -> pathspec.Pattern:
+    # Per pattern, so specs that share patterns (the same --exclude across
+    # different --files, overlapping --assign groups) translate each once.
+    return pathspec.util.lookup_pattern("gitignore")(pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_spec(patterns: tuple[str, ...]) -> "pathspec.PathSpec[pathspec.Pattern]":
+    return pathspec.PathSpec.from_lines(_compile_pattern, patterns)
+
+
+def _regex_fragments(patterns: tuple[str, ...]) -> list[str] | None:
+    # The compiled gitignore regexes as match()-anchored fragments that can be
+    # joined into one alternation. Negated patterns make the result depend on
+    # pattern order (last match wins), so those return None and are left to
+    # PathSpec.
+    fragments: list[str] = []
+    for pattern in _compile_spec(patterns).patterns:
+        if pattern.include is None:
+            continue
+        if not pattern.include or not isinstance(pattern, pathspec.RegexPattern):
+            return None
+        if pattern.regex is None:
+            return None
+        regex = pattern.regex.pattern
+        if not regex.startswith("^"):
+            # PathSpec applies these with search(); anchor them for match().
+            regex = f"[\\s\\S]*?(?:{regex})"
+        fragments.append(f"(?:{regex})")
+    return fragments
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_regex(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    fragments = _regex_fragments(patterns)
+    if fragments is None:
+        return None
+    return re.compile("|".join(fragments) or r"[^\s\S]")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_filter(
+    include: tuple[str, ...], exclude: tuple[str, ...]
+) -> re.Pattern[str] | None:
+    # Include and exclude sets fused into one regex, "(?!excludes)(?:includes)",
+    # so each path costs a single match() call.
+    if include in _MATCH_ALL_PATTERNS:
+        include_fragments: list[str] | None = ["(?:)"]
+    else:
+        include_fragments = _regex_fragments(include)
+    exclude_fragments = _regex_fragments(exclude)
+    if include_fragments is None or exclude_fragments is None:
+        return None
+
+    regex = f"(?:{'|'.join(include_fragments) or '(?!)'})"
+    if exclude_fragments:
+        regex = f"(?!{'|'.join(exclude_fragments)}){regex}"
+    return re.compile(regex)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_matcher(patterns: tuple[str, ...]) -> Callable[[str], object]:
+    prefixes: list[str] = []
+    rest: list[str] = []
+    for pattern in patterns:
+        if literal := _LITERAL_DIR_PATTERN.fullmatch(pattern):
+            prefixes.append(literal[1])
+        else:
+            rest.append(pattern)
+
+    starts = tuple(prefixes)
+    regex = _compile_regex(tuple(rest))
+    if regex is None:
+        # Negated patterns depend on order; leave the whole set to PathSpec.
+        return _compile_spec(patterns).match_file
+    if not rest:
+        return lambda path: path.startswith(starts)
+    if not prefixes:
+        return regex.match
+    return lambda path: path.startswith(starts) or regex.match(path)
+
+
+def _literal_dir_prefixes(patterns: list[str]) -> tuple[str, ...]:
+    # The literal directory each positive pattern is confined to ("src/" for
+    # "src/**/*.py"), or () when any of them could match outside one.
+    # Negations only remove paths, so they never widen the scope.
+    prefixes: set[str] = set()
+    for pattern in patterns:
+        if not pattern or pattern.startswith(("!", "#")):
+            continue
+        # Only patterns with a leading or inner "/" are anchored to the root.
+        if "/" not in pattern.rstrip("/"):
+            return ()
+        literal = _GLOB_CHARS.split(pattern.lstrip("/"), maxsplit=1)[0]
+        directory, slash, _ = literal.rpartition("/")
+        segments = set(directory.split("/"))
+        if not slash or "\\" in literal or segments & {"", ".", ".."}:
+            return ()
+        prefixes.add(f"{directory}/")
+    return tuple(sorted(prefixes))
+
+
+def _match_paths(patterns: tuple[str, ...], paths: list[str]) -> set[str]:
+    regex = _compile_regex(patterns)
+    if regex is not None:
+        return set(filter(regex.match, paths))
+    return set(_compile_spec(patterns).match_files(paths))
+
 
 def filter_files(
     files: list[FileDiff],
     include_patterns: list[str],
     exclude_patterns: list[str],
 ) -> list[FileDiff]:
-    if include_patterns:
-        include_spec = pathspec.PathSpec.from_lines("gitignore", include_patterns)
+    # Empty lines are not patterns; an include list of only those (--files "")
+    # filters nothing, as an empty PathSpec did.
+    include = tuple(p for p in include_patterns if p)
+    exclude = tuple(p for p in exclude_patterns if p)
+    if include in _MATCH_ALL_PATTERNS and not exclude:
+        # Nothing to filter; callers only read the result, so skip the copy.
+        return files
+
+    # Match against a flat column of paths and select the diffs by mask.
+    paths = [f.path for f in files]
+
+    combined = _compile_filter(include, exclude)
+    if combined is not None:
+        return list(compress(files, map(combined.match, paths)))
+
+    # Negated patterns fall back to PathSpec's ordered semantics per side.
+    if include not in _MATCH_ALL_PATTERNS:
+        included = _match_paths(include, paths)
     else:
-        include_spec = None
+        included = None
 
-    if exclude_patterns:
-        exclude_spec = pathspec.PathSpec.from_lines("gitignore", exclude_patterns)
+    if exclude:
+        excluded = _match_paths(exclude, paths)
     else:
-        exclude_spec = None
+        excluded = set()
 
-    result: list[FileDiff] = []
-    for f in files:
-        if include_spec and not include_spec.match_file(f.path):
-            continue
-        if exclude_spec and exclude_spec.match_file(f.path):
-            continue
-        result.append(f)
+    mask = [
+        (included is None or p in included) and p not in excluded for p in paths
+    ]
+    return list(compress(files, mask))
 
-    return result
 
+def _sort_by_path(files: list[FileDiff]) -> list[FileDiff]:
+    # Diffs usually arrive in git's path order; check in O(n) before sorting.
+    paths = [f.path for f in files]
+    if all(map(le, paths, islice(paths, 1, None))):
+        return files
+    return sorted(files, key=attrgetter("path"))
 
-def distribute_files(files: list[FileDiff], num_prs: int) -> list[list[FileDiff]]:
-    sorted_files = sorted(files, key=lambda f: f.path)
-    groups: list[list[FileDiff]] = [[] for _ in range(num_prs)]
 
-    for i, f in enumerate(sorted_files):
-        groups[i % num_prs].append(f)
+def distribute_files(files: list[FileDiff], num_prs: int) -> list[list[FileDiff]]:
+    sorted_files = _sort_by_path(files)
+    if any(f.size for f in sorted_files):
+        groups = _pack_by_size(sorted_files, num_prs)
+    else:
+        # Round-robin: group k takes every num_prs-th file starting at k.
+        groups = [sorted_files[k::num_prs] for k in range(num_prs)]
 
     # Remove empty groups
     return [g for g in groups if g]
 
 
+def _pack_by_size(files: list[FileDiff], num_prs: int) -> list[list[FileDiff]]:
+    # Largest file first into the group with the fewest changed lines (then
+    # fewest files, then lowest index). The biggest group ends up within 4/3
+    # of the best possible. Each group keeps the path order of `files`.
+    order = sorted(range(len(files)), key=lambda i: -files[i].size)
+    heap = [(0, 0, k) for k in range(num_prs)]
+    members: list[list[int]] = [[] for _ in range(num_prs)]
+    for i in order:
+        total, count, k = heap[0]
+        members[k].append(i)
+        heapq.heapreplace(heap, (total + files[i].size, count + 1, k))
+    return [[files[i] for i in sorted(m)] for m in members]
+
+
 def assign_files(
     files: list[FileDiff],
     assignments: dict[int, list[str]],
@@ -57,21 +235,19 @@ def assign_files(
     groups: list[list[FileDiff]] = [[] for _ in range(num_prs)]
     leftover: list[FileDiff] = []
 
-    # Build pathspecs for each group
-    group_specs: dict[int, pathspec.PathSpec] = {}
-    for group_num, patterns in assignments.items():
-        group_specs[group_num] = pathspec.PathSpec.from_lines("gitignore", patterns)
+    # Build a matcher for each group, checked in order (1, 2, 3, ...)
+    matchers = [
+        (_compile_matcher(tuple(assignments[group_num])), groups[group_num - 1])
+        for group_num in sorted(assignments)
+    ]
 
-    sorted_files = sorted(files, key=lambda f: f.path)
+    sorted_files = _sort_by_path(files)
     for f in sorted_files:
-        assigned = False
-        # Check groups in order (1, 2, 3, ...)
-        for group_num in sorted(group_specs.keys()):
-            if group_specs[group_num].match_file(f.path):
-                groups[group_num - 1].append(f)  # 1-indexed to 0-indexed
-                assigned = True
+        for matches, group in matchers:
+            if matches(f.path):
+                group.append(f)
                 break
-        if not assigned:
+        else:
             leftover.append(f)
 
     result = [g for g in groups if g]
@@ -81,68 +257,77 @@ def assign_files(
     return result
 
 
+def _branch_base(source_branch: str, prefix: str) -> str:
+    # Add the prefix unless the branch already carries it.
+    return f"{prefix}{source_branch.removeprefix(prefix)}"
+
+
 def generate_branch_name(
     source_branch: str, prefix: str, index: int, total: int, is_leftover: bool = False
 ) -> str:
-    base = source_branch
-    if prefix and not base.startswith(prefix):
-        base = f"{prefix}{base}"
-    if is_leftover:
-        return f"{base}-part-leftover-of-{total}"
-    return f"{base}-part-{index + 1}-of-{total}"
+    return _BRANCH_NAME_TEMPLATE.format(
+        base=_branch_base(source_branch, prefix),
+        part="leftover" if is_leftover else index + 1,
+        total=total,
+    )
 
 
 def build_pr_body(
-    group: PrGroup,
+    index: int,
+    files: list[FileDiff],
     total: int,
     source_branch: str,
     depends_on: str | None = None,
     source_body: str | None = None,
 ) -> str:
-    lines: list[str] = []
-
-    if source_body:
-        lines.append(source_body)
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-
-    lines.append(f"Part {group.index + 1} of {total} from `{source_branch}`.")
-    lines.append("")
-    lines.append("## Files")
-    lines.append("")
-    for f in group.files:
-        status_label = {
-            "A": "added",
-            "M": "modified",
-            "D": "deleted",
-            "R": "renamed",
-            "C": "copied",
-            "T": "type changed",
-        }.get(f.status, f.status)
-        lines.append(f"- `{f.path}` ({status_label})")
-    lines.append("")
-
-    if depends_on:
-        lines.append(f"Depends on: {depends_on}")
-        lines.append("")
-
-    return "\n".join(lines)
-
-
-def split(config: SplitConfig) -> SplitResult:
-    repo = open_repo(str(config.repo_path))
-    validate_repo_state(repo, config.base_branch)
-
-    source_branch = config.source_branch or get_current_branch(repo)
-    all_files = get_changed_files(repo, config.base_branch)
-
-    if not all_files:
-        raise ValidationError("No changed files found between branches.")
+    file_lines = "\n".join(
+        [f"- `{f.path}` ({_STATUS_LABELS.get(f.status, f.status)})" for f in files]
+    )
+    return _PR_BODY_TEMPLATE.format(
+        prefix=f"{source_body}\n\n---\n\n" if source_body else "",
+        part=index + 1,
+        total=total,
+        source_branch=source_branch,
+        file_lines=file_lines,
+        footer=f"\nDepends on: {depends_on}\n" if depends_on else "",
+    )
+
+
+def _validate_patterns(config: SplitConfig) -> None:
+    # Compile every pattern set before split() reads the diff: invalid
+    # patterns fail fast, and filter_files / assign_files then hit the
+    # compile caches.
+    include = tuple(config.file_patterns)
+    exclude = tuple(config.exclude_patterns)
+    try:
+        _compile_spec(include)
+        _compile_spec(exclude)
+        _compile_filter(include, exclude)
+        for patterns in config.assignments.values():
+            _compile_matcher(tuple(patterns))
+    except ValueError as e:
+        raise ValidationError(f"Invalid file pattern: {e}")
+
+
+def split(config: SplitConfig, repo: Repo | None = None) -> SplitResult:
+    _validate_patterns(config)
+    if repo is None:
+        repo = open_repo(str(config.repo_path))
+    current_branch = validate_repo_state(repo, config.base_branch)
+
+    source_branch = config.source_branch or current_branch
+    # When every --files pattern sits under a literal directory, only those
+    # directories are diffed.
+    scope = _literal_dir_prefixes(config.file_patterns)
+    all_files = get_changed_files(repo, config.base_branch, scope)
 
     filtered = filter_files(all_files, config.file_patterns, config.exclude_patterns)
 
     if not filtered:
+        if scope:
+            all_files = get_changed_files(repo, config.base_branch)
+        if not all_files:
+            raise ValidationError("No changed files found between branches.")
         raise ValidationError(
             "No files match the given patterns. "
             f"Total changed files: {len(all_files)}."
@@ -156,6 +341,8 @@ def split(config: SplitConfig) -> SplitResult:
 
     warnings: list[str] = []
 
+    # Git's diff order is usually path order, which the distribution
+    # functions detect in one pass, but diff.orderFile can reorder it.
     if config.assignments:
         distributed = assign_files(filtered, config.assignments, config.num_prs)
         has_leftover = len(distributed) > config.num_prs
@@ -177,10 +364,12 @@ def split(config: SplitConfig) -> SplitResult:
 
     groups: list[PrGroup] = []
     total = len(distributed)
+    # Resolve the prefix once; the base is then passed with an empty prefix.
+    branch_base = _branch_base(source_branch, config.prefix)
     for i, file_group in enumerate(distributed):
         is_leftover = has_leftover and i == len(distributed) - 1
         branch_name = generate_branch_name(
-            source_branch, config.prefix, i, total, is_leftover=is_leftover
+            branch_base, "", i, total, is_leftover=is_leftover
         )
 
         # Use custom title if provided (1-indexed), else default
@@ -193,21 +382,11 @@ def split(config: SplitConfig) -> SplitResult:
             title = f"[{i + 1}/{total}] {base_title}"
 
         body = build_pr_body(
-            PrGroup(
-                index=i,
-                branch_name=branch_name,
-                files=file_group,
-                title=title,
-                body="",
-                depends_on=config.depends_on,
-            ),
-            total,
-            source_branch,
-            config.depends_on,
-            source_body,
+            i, file_group, total, source_branch, config.depends_on, source_body
         )
+        # Every field is built here from validated data; skip re-validation.
         groups.append(
-            PrGroup(
+            PrGroup.model_construct(
                 index=i,
                 branch_name=branch_name,
                 files=file_group,
@@ -225,14 +404,15 @@ def split(config: SplitConfig) -> SplitResult:
     )
 
 
-def execute_split(config: SplitConfig, result: SplitResult) -> None:
-    repo = open_repo(str(config.repo_path))
+def execute_split(
+    config: SplitConfig, result: SplitResult, repo: Repo | None = None
+) -> None:
+    if repo is None:
+        repo = open_repo(str(config.repo_path))
 
-    for group in result.groups:
-        create_branch_with_files(
-            repo=repo,
-            branch_name=group.branch_name,
-            base_branch=result.base_branch,
-            source_branch=result.source_branch,
-            files=group.files,
-        )
+    create_all_branches(
+        repo,
+        result.base_branch,
+        result.source_branch,
+        [(group.branch_name, group.files) for group in result.groups],
+    )
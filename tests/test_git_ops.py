@@ -1,4 +1,8 @@
+import io
+import os
+import subprocess
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
 from git import Repo
@@ -6,10 +10,12 @@ from git import Repo
 from pr_splitter.errors import GitError
 from pr_splitter.git_ops import (
     branch_exists,
+    create_all_branches,
     create_branch_with_files,
     get_changed_files,
     get_current_branch,
     open_repo,
+    push_branches,
     validate_repo_state,
 )
 from pr_splitter.models import FileDiff
@@ -20,6 +26,10 @@ class TestOpenRepo:
         repo = open_repo(str(clean_git_repo.working_dir))
         assert repo.working_dir == clean_git_repo.working_dir
 
+    def test_reuses_open_repo(self, clean_git_repo: Repo) -> None:
+        repo = open_repo(str(clean_git_repo.working_dir))
+        assert open_repo(str(clean_git_repo.working_dir)) is repo
+
     def test_invalid_path(self, tmp_path: object) -> None:
         import tempfile
 
@@ -38,6 +48,20 @@ class TestValidateRepoState:
         with pytest.raises(GitError, match="not clean"):
             validate_repo_state(clean_git_repo, "main")
 
+    def test_returns_current_branch(self, clean_git_repo: Repo) -> None:
+        assert validate_repo_state(clean_git_repo, "main") == "feature/test"
+
+    def test_modified_tracked_file(self, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        Path(clean_git_repo.working_dir, "README.md").write_text("changed")
+        with pytest.raises(GitError, match="not clean"):
+            validate_repo_state(clean_git_repo, "main")
+
+    def test_detached_head(self, clean_git_repo: Repo) -> None:
+        clean_git_repo.git.checkout("--detach")
+        with pytest.raises(GitError, match="detached"):
+            validate_repo_state(clean_git_repo, "main")
+
     def test_nonexistent_base(self, clean_git_repo: Repo) -> None:
         with pytest.raises(GitError, match="does not exist"):
             validate_repo_state(clean_git_repo, "nonexistent")
@@ -63,6 +87,47 @@ class TestGetChangedFiles:
         files = get_changed_files(clean_git_repo, "main")
         assert all(f.status == "A" for f in files)
 
+    def test_limited_to_paths(self, clean_git_repo: Repo) -> None:
+        files = get_changed_files(clean_git_repo, "main", ["tests/"])
+        assert [f.path for f in files] == ["tests/test_foo.py"]
+
+    def test_mismatched_records(self, clean_git_repo: Repo) -> None:
+        output = io.BytesIO(b":100644 100644 aaa bbb M\0a.py\0")
+        proc = MagicMock(stdout=output)
+        git_cls = type(clean_git_repo.git)
+        with patch.object(git_cls, "diff", create=True, return_value=proc):
+            with pytest.raises(GitError, match="1 changed paths but 0 line counts"):
+                get_changed_files(clean_git_repo, "main")
+
+    def test_sizes_from_line_counts(self, clean_git_repo: Repo) -> None:
+        files = get_changed_files(clean_git_repo, "main")
+        assert all(f.size > 0 for f in files)
+
+    def test_nested_and_prefixed_paths(self, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        names = ["src.txt", "src0.txt", "src-a.txt", "a/b/c.txt", "a.txt"]
+        for name in names:
+            path = Path(clean_git_repo.working_dir, name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x\n")
+        clean_git_repo.index.add(names)
+        clean_git_repo.index.commit("Add more files")
+
+        paths = [f.path for f in get_changed_files(clean_git_repo, "main")]
+        assert set(names) <= set(paths)
+        assert len(paths) == len(set(paths))
+
+    def test_unusual_file_names(self, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        names = ["with\ttab.txt", "with space.txt", "caf\u00e9.txt"]
+        for name in names:
+            Path(clean_git_repo.working_dir, name).write_text("x\n")
+        clean_git_repo.index.add(names)
+        clean_git_repo.index.commit("Add oddly named files")
+
+        paths = {f.path for f in get_changed_files(clean_git_repo, "main")}
+        assert set(names) <= paths
+
 
 class TestCreateBranchWithFiles:
     def test_creates_branch(self, clean_git_repo: Repo) -> None:
@@ -92,6 +157,92 @@ class TestCreateBranchWithFiles:
         # Go back
         clean_git_repo.heads["feature/test"].checkout()
 
+    def test_deleted_file_removed(self, clean_git_repo: Repo) -> None:
+        clean_git_repo.index.remove(["README.md"], working_tree=True)
+        clean_git_repo.index.commit("Remove README")
+
+        files = [FileDiff(path="README.md", status="D")]
+        create_branch_with_files(
+            clean_git_repo, "split-part-1", "main", "feature/test", files
+        )
+
+        tree = clean_git_repo.heads["split-part-1"].commit.tree
+        assert "README.md" not in tree
+        assert "src" not in tree
+
+    def test_non_utf8_file_name(self, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        name = os.fsdecode(b"caf\xe9.txt")
+        Path(clean_git_repo.working_dir, name).write_text("x\n")
+        clean_git_repo.git.add(name)
+        clean_git_repo.git.commit("-m", "Add Latin-1 named file")
+
+        files = [f for f in get_changed_files(clean_git_repo, "main") if f.path == name]
+        create_branch_with_files(
+            clean_git_repo, "split-part-1", "main", "feature/test", files
+        )
+
+        listing = subprocess.run(
+            ["git", "ls-tree", "-r", "-z", "--name-only", "split-part-1"],
+            cwd=clean_git_repo.working_dir,
+            check=True,
+            capture_output=True,
+        ).stdout
+        assert b"caf\xe9.txt" in listing.split(b"\0")
+
+
+class TestCreateAllBranches:
+    def test_creates_each_branch(self, clean_git_repo: Repo) -> None:
+        branches = [
+            ("split-part-1", [FileDiff(path="src/foo.py", status="A")]),
+            ("split-part-2", [FileDiff(path="tests/test_foo.py", status="A")]),
+        ]
+        create_all_branches(clean_git_repo, "main", "feature/test", branches)
+
+        part_1 = clean_git_repo.heads["split-part-1"].commit.tree
+        assert {item.path for item in part_1.traverse()} == {
+            "README.md",
+            "src",
+            "src/foo.py",
+        }
+        part_2 = clean_git_repo.heads["split-part-2"].commit.tree
+        assert {item.path for item in part_2.traverse()} == {
+            "README.md",
+            "tests",
+            "tests/test_foo.py",
+        }
+        assert get_current_branch(clean_git_repo) == "feature/test"
+
+    def test_existing_branch_creates_none(self, clean_git_repo: Repo) -> None:
+        clean_git_repo.create_head("split-part-2", "main")
+        branches = [
+            ("split-part-1", [FileDiff(path="src/foo.py", status="A")]),
+            ("split-part-2", [FileDiff(path="tests/test_foo.py", status="A")]),
+        ]
+        with pytest.raises(GitError, match="Failed to create branches"):
+            create_all_branches(clean_git_repo, "main", "feature/test", branches)
+
+        assert not branch_exists(clean_git_repo, "split-part-1")
+
+
+class TestPushBranches:
+    def test_sets_upstream_for_each_branch(
+        self, clean_git_repo: Repo, tmp_path_factory: pytest.TempPathFactory
+    ) -> None:
+        remote = Repo.init(tmp_path_factory.mktemp("remote"), bare=True)
+        clean_git_repo.create_remote("origin", str(remote.git_dir))
+        clean_git_repo.create_head("split-part-1", "main")
+        clean_git_repo.create_head("split-part-2", "main")
+
+        assert clean_git_repo.working_dir is not None
+        push_branches(["split-part-1", "split-part-2"], clean_git_repo.working_dir)
+
+        for name in ("split-part-1", "split-part-2"):
+            assert name in remote.heads
+            tracking = clean_git_repo.heads[name].tracking_branch()
+            assert tracking is not None
+            assert tracking.name == f"origin/{name}"
+
 
 class TestBranchExists:
     def test_existing_branch(self, clean_git_repo: Repo) -> None:
@@ -100,3 +251,11 @@ class TestBranchExists:
 
     def test_nonexistent_branch(self, clean_git_repo: Repo) -> None:
         assert not branch_exists(clean_git_repo, "nonexistent")
+
+    def test_branch_name_prefix_does_not_match(self, clean_git_repo: Repo) -> None:
+        assert not branch_exists(clean_git_repo, "feature")
+
+    def test_remote_branch(self, clean_git_repo: Repo) -> None:
+        head = clean_git_repo.head.commit.hexsha
+        clean_git_repo.git.update_ref("refs/remotes/origin/remote-only", head)
+        assert branch_exists(clean_git_repo, "remote-only")
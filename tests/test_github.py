@@ -1,10 +1,16 @@
 import json
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from pr_splitter.errors import GitHubError
-from pr_splitter.github import check_gh_available, create_pr, get_current_pr_info
+from pr_splitter.github import (
+    check_gh_available,
+    create_all_prs,
+    create_pr,
+    get_current_pr_info,
+)
 from pr_splitter.models import FileDiff, PrGroup
 
 
@@ -62,6 +68,67 @@ class TestCreatePr:
             create_pr(group, "main", True, "/tmp/repo")
 
 
+class TestCreateAllPrs:
+    @patch("pr_splitter.github.push_branches")
+    @patch("pr_splitter.github.check_gh_available")
+    @patch("pr_splitter.github.subprocess.run")
+    def test_preserves_group_order(
+        self, mock_run: MagicMock, _mock_check: MagicMock, mock_push: MagicMock
+    ) -> None:
+        def fake_run(cmd: list[str], **kwargs: object) -> MagicMock:
+            branch = cmd[cmd.index("--head") + 1]
+            number = branch.rsplit("-", 1)[-1]
+            return MagicMock(stdout=f"https://github.com/org/repo/pull/{number}\n")
+
+        mock_run.side_effect = fake_run
+        groups = [
+            PrGroup(
+                index=i,
+                branch_name=f"feat-part-{i + 1}",
+                files=[FileDiff(path=f"{i}.py", status="A")],
+                title=f"[{i + 1}/3] feat",
+                body="",
+            )
+            for i in range(3)
+        ]
+        created = create_all_prs(groups, "main", True, "/tmp/repo")
+        assert [pr.number for pr in created] == [1, 2, 3]
+        mock_push.assert_called_once_with(
+            ["feat-part-1", "feat-part-2", "feat-part-3"], "/tmp/repo"
+        )
+
+    @patch("pr_splitter.github.push_branches")
+    @patch("pr_splitter.github.check_gh_available")
+    @patch("pr_splitter.github.subprocess.run")
+    def test_failure_reports_created_prs(
+        self, mock_run: MagicMock, _mock_check: MagicMock, _mock_push: MagicMock
+    ) -> None:
+        def fake_run(cmd: list[str], **kwargs: object) -> MagicMock:
+            branch = cmd[cmd.index("--head") + 1]
+            if branch == "feat-part-2":
+                raise subprocess.CalledProcessError(1, "gh", stderr="boom")
+            number = branch.rsplit("-", 1)[-1]
+            return MagicMock(stdout=f"https://github.com/org/repo/pull/{number}\n")
+
+        mock_run.side_effect = fake_run
+        groups = [
+            PrGroup(
+                index=i,
+                branch_name=f"feat-part-{i + 1}",
+                files=[FileDiff(path=f"{i}.py", status="A")],
+                title=f"[{i + 1}/3] feat",
+                body="",
+            )
+            for i in range(3)
+        ]
+        with pytest.raises(GitHubError) as excinfo:
+            create_all_prs(groups, "main", True, "/tmp/repo")
+        message = str(excinfo.value)
+        assert "feat-part-2" in message
+        assert "pull/1" in message
+        assert "pull/3" in message
+
+
 class TestGetCurrentPrInfo:
     @patch("pr_splitter.github.subprocess.run")
     def test_returns_title_and_body(self, mock_run: MagicMock) -> None:
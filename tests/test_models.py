@@ -36,6 +36,12 @@ class TestFileDiff:
         f = FileDiff(path="new.py", status="R", old_path="old.py")
         assert f.old_path == "old.py"
 
+    def test_frozen_and_hashable(self) -> None:
+        f = FileDiff(path="a.py", status="A")
+        assert {f, FileDiff(path="a.py", status="A")} == {f}
+        with pytest.raises(ValidationError):
+            f.path = "b.py"
+
     def test_invalid_status(self) -> None:
         with pytest.raises(ValidationError):
             FileDiff(path="foo.py", status="X")
@@ -53,6 +59,19 @@ class TestPrGroup:
         assert group.index == 0
         assert len(group.files) == 1
 
+    def test_paths(self) -> None:
+        group = PrGroup(
+            index=0,
+            branch_name="feat-part-1-of-2",
+            files=[FileDiff(path="a.py", status="A"), FileDiff(path="b.py", status="M")],
+            title="[1/2] feat",
+            body="Part 1",
+        )
+        assert group.paths == ("a.py", "b.py")
+        group.files.append(FileDiff(path="c.py", status="D"))
+        assert group.paths == ("a.py", "b.py", "c.py")
+        assert "paths" not in group.model_dump()
+
 
 class TestSplitResult:
     def test_basic(self) -> None:
@@ -60,6 +79,17 @@ class TestSplitResult:
         assert result.warnings == []
         assert result.groups == []
 
+    def test_total_files(self) -> None:
+        files = [FileDiff(path="a.py", status="A"), FileDiff(path="b.py", status="M")]
+        group = PrGroup(
+            index=0, branch_name="feat-part-1-of-1", files=files, title="t", body="b"
+        )
+        result = SplitResult(groups=[group, group])
+        assert result.total_files == 4
+        result.groups.append(group)
+        assert result.total_files == 6
+        assert "total_files" not in result.model_dump()
+
 
 class TestSplitConfigAssignments:
     def test_valid_assignments(self) -> None:
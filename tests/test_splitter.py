@@ -36,11 +36,46 @@ class TestFilterFiles:
         result = filter_files(files, ["**/*.py"], ["tests/**"])
         assert [f.path for f in result] == ["src/a.py"]
 
+    def test_negated_pattern(self) -> None:
+        files = self.make_files(["src/a.py", "src/b.py", "tests/c.py"])
+        result = filter_files(files, ["src/**", "!src/b.py"], [])
+        assert [f.path for f in result] == ["src/a.py"]
+
+    def test_many_patterns(self) -> None:
+        files = self.make_files(["src/a.py", "src/b.js", "docs/c.md", "tests/d.py"])
+        include = [f"pkg{i}/**" for i in range(8)] + ["src/**", "docs/*.md"]
+        result = filter_files(files, include, ["*.js"])
+        assert [f.path for f in result] == ["src/a.py", "docs/c.md"]
+
+    def test_many_patterns_non_utf8_path(self) -> None:
+        # git_ops decodes non-UTF-8 names with surrogateescape.
+        path = b"src/caf\xe9.py".decode("utf-8", "surrogateescape")
+        files = self.make_files([path, "src/b.js"])
+        exclude = [f"pkg{i}/**" for i in range(8)] + ["*.js"]
+        result = filter_files(files, ["*"], exclude)
+        assert [f.path for f in result] == [path]
+
+    def test_large_pattern_list(self) -> None:
+        paths = [f"pkg{i}/mod.py" for i in range(300)] + ["other/x.py"]
+        files = self.make_files(paths)
+        include = [f"pkg{i}/**" for i in range(0, 300, 2)]
+        exclude = [f"pkg{i}/**" for i in range(0, 300, 4)]
+        result = filter_files(files, include, exclude)
+        assert [f.path for f in result] == [
+            f"pkg{i}/mod.py" for i in range(2, 300, 4)
+        ]
+
     def test_no_patterns_returns_all(self) -> None:
         files = self.make_files(["a.py", "b.js"])
         result = filter_files(files, [], [])
         assert len(result) == 2
 
+    @pytest.mark.parametrize("pattern", ["**/*", "**", ""])
+    def test_match_all_pattern_returns_all(self, pattern: str) -> None:
+        files = self.make_files(["a.py", "src/b.js", ".hidden"])
+        result = filter_files(files, [pattern], [])
+        assert result is files
+
 
 class TestDistributeFiles:
     def make_files(self, paths: list[str]) -> list[FileDiff]:
@@ -72,6 +107,15 @@ class TestDistributeFiles:
         assert groups[1][0].path == "b.py"
         assert groups[2][0].path == "c.py"
 
+    def test_balances_by_size(self) -> None:
+        sizes = {"a.py": 10, "b.py": 1, "c.py": 1, "d.py": 100, "e.py": 5}
+        files = [FileDiff(path=p, status="M", size=n) for p, n in sizes.items()]
+        groups = distribute_files(files, 2)
+        assert [[f.path for f in g] for g in groups] == [
+            ["d.py"],
+            ["a.py", "b.py", "c.py", "e.py"],
+        ]
+
 
 class TestAssignFiles:
     def make_files(self, paths: list[str]) -> list[FileDiff]:
@@ -98,6 +142,14 @@ class TestAssignFiles:
         assert len(groups) == 1
         assert groups[0][0].path == "src/a.py"
 
+    def test_directory_and_glob_patterns(self) -> None:
+        files = self.make_files(["docs/a.md", "lib/src/b.py", "src/c.py", "src/d/e.py"])
+        groups = assign_files(files, {1: ["/src/**", "*.md"], 2: ["lib/**"]}, 2)
+        assert [[f.path for f in g] for g in groups] == [
+            ["docs/a.md", "src/c.py", "src/d/e.py"],
+            ["lib/src/b.py"],
+        ]
+
     def test_no_leftover_when_all_assigned(self) -> None:
         files = self.make_files(["a.py", "b.py"])
         groups = assign_files(files, {1: ["a.py"], 2: ["b.py"]}, 2)
@@ -129,44 +181,22 @@ class TestGenerateBranchName:
 
 class TestBuildPrBody:
     def test_contains_file_list(self) -> None:
-        from pr_splitter.models import PrGroup
-
-        group = PrGroup(
-            index=0,
-            branch_name="test-part-1",
-            files=[FileDiff(path="a.py", status="A")],
-            title="[1/2] test",
-            body="",
-        )
-        body = build_pr_body(group, 2, "test")
+        files = [FileDiff(path="a.py", status="A")]
+        body = build_pr_body(0, files, 2, "test")
         assert "`a.py`" in body
         assert "added" in body
         assert "Part 1 of 2" in body
 
     def test_depends_on(self) -> None:
-        from pr_splitter.models import PrGroup
-
-        group = PrGroup(
-            index=0,
-            branch_name="test-part-1",
-            files=[FileDiff(path="a.py", status="A")],
-            title="[1/2] test",
-            body="",
-        )
-        body = build_pr_body(group, 2, "test", depends_on="#123")
+        files = [FileDiff(path="a.py", status="A")]
+        body = build_pr_body(0, files, 2, "test", depends_on="#123")
         assert "#123" in body
 
     def test_source_body_prepended(self) -> None:
-        from pr_splitter.models import PrGroup
-
-        group = PrGroup(
-            index=0,
-            branch_name="test-part-1",
-            files=[FileDiff(path="a.py", status="A")],
-            title="[1/2] test",
-            body="",
+        files = [FileDiff(path="a.py", status="A")]
+        body = build_pr_body(
+            0, files, 2, "test", source_body="Original PR description"
         )
-        body = build_pr_body(group, 2, "test", source_body="Original PR description")
         assert body.startswith("Original PR description")
         assert "---" in body
         assert "`a.py`" in body
@@ -182,8 +212,7 @@ class TestSplit:
         )
         result = split(config)
         assert len(result.groups) == 2
-        total_files = sum(len(g.files) for g in result.groups)
-        assert total_files == 4
+        assert result.total_files == 4
 
     @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
     def test_split_with_filter(self, _mock: object, clean_git_repo: Repo) -> None:
@@ -194,8 +223,68 @@ class TestSplit:
             repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
         )
         result = split(config)
-        total_files = sum(len(g.files) for g in result.groups)
-        assert total_files == 3  # Only src/ files
+        assert result.total_files == 3  # Only src/ files
+
+    @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
+    def test_split_no_match_reports_all_changes(
+        self, _mock: object, clean_git_repo: Repo
+    ) -> None:
+        assert clean_git_repo.working_dir is not None
+        config = SplitConfig(
+            num_prs=2,
+            file_patterns=["docs/**"],
+            repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
+        )
+        with pytest.raises(ValidationError, match="Total changed files: 4"):
+            split(config)
+
+    def test_split_invalid_pattern(self, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        config = SplitConfig(
+            num_prs=2,
+            exclude_patterns=["!"],
+            repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
+        )
+        with patch("pr_splitter.splitter.get_changed_files") as mock_diff:
+            with pytest.raises(ValidationError, match="Invalid file pattern"):
+                split(config)
+        mock_diff.assert_not_called()
+
+    @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
+    def test_split_ignores_diff_order_file(
+        self,
+        _mock: object,
+        clean_git_repo: Repo,
+        tmp_path_factory: pytest.TempPathFactory,
+    ) -> None:
+        assert clean_git_repo.working_dir is not None
+        order_file = tmp_path_factory.mktemp("order") / "order.txt"
+        order_file.write_text("tests/*\nsrc/foo.py\n")
+        with clean_git_repo.config_writer() as writer:
+            writer.set_value("diff", "orderFile", str(order_file))
+        config = SplitConfig(
+            num_prs=2,
+            repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
+        )
+        result = split(config)
+        assert [g.paths for g in result.groups] == [
+            ("src/bar.py", "src/foo.py"),
+            ("src/baz.py", "tests/test_foo.py"),
+        ]
+
+    @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
+    def test_split_with_prefix(self, _mock: object, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        config = SplitConfig(
+            num_prs=2,
+            prefix="split/",
+            repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
+        )
+        result = split(config)
+        assert [g.branch_name for g in result.groups] == [
+            "split/feature/test-part-1-of-2",
+            "split/feature/test-part-2-of-2",
+        ]
 
     @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
     def test_split_warns_on_excess_prs(self, _mock: object, clean_git_repo: Repo) -> None:
@@ -218,10 +307,8 @@ class TestSplit:
         )
         result = split(config)
         assert len(result.groups) == 2
-        src_files = [f.path for f in result.groups[0].files]
-        assert all(f.startswith("src/") for f in src_files)
-        test_files = [f.path for f in result.groups[1].files]
-        assert all(f.startswith("tests/") for f in test_files)
+        assert all(p.startswith("src/") for p in result.groups[0].paths)
+        assert all(p.startswith("tests/") for p in result.groups[1].paths)
 
     @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
     def test_split_with_assignments_leftover(self, _mock: object, clean_git_repo: Repo) -> None:
@@ -283,3 +370,18 @@ class TestExecuteSplit:
 
         for group in result.groups:
             assert branch_exists(clean_git_repo, group.branch_name)
+
+    @patch("pr_splitter.splitter.get_current_pr_info", return_value={})
+    def test_reuses_given_repo(self, _mock: object, clean_git_repo: Repo) -> None:
+        assert clean_git_repo.working_dir is not None
+        config = SplitConfig(
+            num_prs=2,
+            repo_path=clean_git_repo.working_dir,  # type: ignore[arg-type]
+        )
+        with patch("pr_splitter.splitter.open_repo") as mock_open:
+            result = split(config, clean_git_repo)
+            execute_split(config, result, clean_git_repo)
+        mock_open.assert_not_called()
+
+        for group in result.groups:
+            assert branch_exists(clean_git_repo, group.branch_name)